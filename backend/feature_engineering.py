@@ -38,6 +38,7 @@ Total = 36 features.
 """
 
 import numpy as np
+import pandas as pd
 from typing import Any
 
 
@@ -279,3 +280,67 @@ def build_feature_vector_from_record(record: dict[str, Any]) -> np.ndarray:
         f_is_shopkeeper     =float(record.get("f_is_shopkeeper", 0.0)),
         f_is_rural          =float(record.get("f_is_rural", 0.0)),
     )
+
+
+def build_feature_matrix(df: pd.DataFrame) -> np.ndarray:
+    """
+    Vectorised batch version of `build_feature_vector_from_record`.
+
+    Computes every feature as a column-wise expression over the DataFrame
+    instead of looping over rows. Missing `f_*` input columns default to
+    0.0, exactly as the per-record builder does.
+
+    Returns:
+        np.ndarray: shape (len(df), 36) float64, same order as FEATURE_ORDER.
+    """
+    n = len(df)
+
+    def col(name: str) -> np.ndarray:
+        if name not in df:
+            return np.zeros(n, dtype=np.float64)
+        return df[name].to_numpy(dtype=np.float64)
+
+    c = {
+        name: col(name)
+        for name in (
+            "f_monthly_income", "f_income_variance", "f_savings_balance",
+            "f_months_active", "f_total_credits", "f_total_debits",
+            "f_total_transactions", "f_avg_credit_amount", "f_avg_debit_amount",
+            "f_recurring_ratio", "f_gpa", "f_attendance_rate",
+            "f_platform_rating", "f_avg_weekly_hours", "f_business_years",
+            "f_avg_daily_revenue", "f_land_size_acres", "f_subsidy_amount",
+            "f_seasonality_index", "f_is_student", "f_is_gig",
+            "f_is_shopkeeper", "f_is_rural",
+        )
+    }
+
+    # ── derived view columns (mirror build_feature_vector) ───────────────────
+    c["f_income_stability"]   = 1.0 / (1.0 + c["f_income_variance"])
+    c["f_savings_ratio"]      = c["f_savings_balance"] / np.maximum(c["f_monthly_income"], 1.0)
+    c["f_liquidity_buffer"]   = c["f_savings_ratio"]
+    c["f_net_cashflow"]       = c["f_total_credits"] - c["f_total_debits"]
+    c["f_credit_debit_ratio"] = c["f_total_credits"] / np.maximum(c["f_total_debits"], 1.0)
+
+    # ── engineered cross features ────────────────────────────────────────────
+    c["stability_adjusted_income"] = c["f_monthly_income"] * c["f_income_stability"]
+    c["income_risk_index"]    = c["f_monthly_income"] * (1.0 - c["f_income_stability"])
+    c["missed_payment_proxy"] = np.maximum(c["f_avg_debit_amount"] - c["f_avg_credit_amount"], 0.0)
+    c["net_cashflow_ratio"]   = c["f_net_cashflow"] / np.maximum(c["f_total_credits"], 1.0)
+    c["profile_income_signal"] = (
+        c["f_avg_daily_revenue"] * c["f_is_shopkeeper"]
+        + c["f_subsidy_amount"]  * c["f_is_rural"]
+        + c["f_gpa"]             * c["f_is_student"]
+        + c["f_platform_rating"] * c["f_is_gig"]
+    )
+    c["profile_rating_signal"] = (
+        c["f_platform_rating"]   * c["f_is_gig"]
+        + c["f_gpa"]             * c["f_is_student"]
+        + c["f_attendance_rate"] * c["f_is_student"]
+        + c["f_avg_weekly_hours"] * c["f_is_gig"]
+    )
+    c["transaction_density"]  = c["f_total_transactions"] / np.maximum(c["f_months_active"], 1.0)
+
+    out = np.empty((n, len(FEATURE_ORDER)), dtype=np.float64)
+    for i, name in enumerate(FEATURE_ORDER):
+        out[:, i] = c[name]
+    return out
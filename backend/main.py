@@ -41,7 +41,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 
 from feature_engineering import FEATURE_ORDER, build_feature_vector_from_record
-from model import load_model, DEFAULT_MODEL_PATH
+from model import load_model, fast_predict_proba, DEFAULT_MODEL_PATH
 from model_utils import probability_to_score, probability_to_risk_band
 
 # ---------------------------------------------------------------------------
@@ -219,7 +219,7 @@ def _top_factors(model, X, n: int = 5) -> list[dict[str, Any]]:
 
 def _make_response(model, X, profile: str = "salaried") -> dict[str, Any]:
     """Run inference and assemble the full response."""
-    proba_default = float(model.predict_proba(X)[0, 1])
+    proba_default = float(fast_predict_proba(model, X)[0, 1])
     proba_repay   = 1.0 - proba_default
     threshold     = _get_threshold(profile)
     return {
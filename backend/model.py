@@ -1,5 +1,5 @@
 """
-Credit scoring model: GradientBoostingClassifier wrapped in CalibratedClassifierCV
+Credit scoring model: HistGradientBoostingClassifier wrapped in CalibratedClassifierCV
 for well-calibrated probability outputs. (MCE 0.04 vs 0.53 for LogReg).
 
 GBM advantages over LogReg for this task:
@@ -7,32 +7,79 @@ GBM advantages over LogReg for this task:
   - Native handling of mixed feature types (one-hot + continuous)
   - Achieves calibration MCE ~0.04 vs 0.53 for LogReg on the same data
   - Stable feature importance via tree splits
+
+The histogram-based GBM bins each feature into <=256 buckets once and
+searches splits over the bins, which is far faster to fit than the
+exact-split GradientBoostingClassifier at the same depth/learning rate.
 """
 
+import hashlib
+
 import joblib
 import numpy as np
+import sklearn
 from pathlib import Path
-from sklearn.calibration import CalibratedClassifierCV, calibration_curve
-from sklearn.ensemble import GradientBoostingClassifier
+from sklearn.base import clone
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.isotonic import IsotonicRegression
+from sklearn.model_selection import train_test_split
 from typing import Tuple
 
+try:
+    from sklearn.frozen import FrozenEstimator  # scikit-learn >= 1.6
+except ImportError:
+    FrozenEstimator = None  # older scikit-learn: fall back to cv="prefit"
+
 DEFAULT_MODEL_PATH = Path(__file__).resolve().parent / "credit_model.pkl"
 
+CALIBRATION_METHOD = "isotonic"   # non-parametric; better than sigmoid for GBM
+CALIBRATION_SIZE   = 0.20         # stratified holdout used only for calibration
+
 
-def _build_base_estimator() -> GradientBoostingClassifier:
+def _build_base_estimator() -> HistGradientBoostingClassifier:
     """
-    GradientBoostingClassifier with conservative hyperparameters:
+    HistGradientBoostingClassifier with conservative hyperparameters:
       - Shallow trees (max_depth=4) to reduce overfitting on small dataset
       - Low learning_rate + more trees for stable convergence
-      - subsample=0.8 for stochastic boosting (also reduces overfitting)
+      - l2_regularization=1.0 on leaf values (HGBT has no subsample)
+      - early_stopping off so the model always grows the full 300 iterations
     """
-    return GradientBoostingClassifier(
-        n_estimators=300,
+    return HistGradientBoostingClassifier(
+        max_iter=300,
         max_depth=4,
         learning_rate=0.05,
-        subsample=0.8,
+        l2_regularization=1.0,
         min_samples_leaf=20,
         random_state=42,
+        early_stopping=False,
+    )
+
+
+def _build_calibrated_estimator(base: HistGradientBoostingClassifier) -> CalibratedClassifierCV:
+    """Unfitted isotonic calibrator around an already-fitted base GBM."""
+    if FrozenEstimator is not None:
+        # ensemble="auto" resolves to False → one base model, one calibrator
+        return CalibratedClassifierCV(
+            estimator=FrozenEstimator(base),
+            method=CALIBRATION_METHOD,
+        )
+    return CalibratedClassifierCV(
+        estimator=base,
+        method=CALIBRATION_METHOD,
+        cv="prefit",
+    )
+
+
+def _calibration_split(y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (fit_idx, cal_idx) row indices for the stratified CALIBRATION_SIZE holdout.
+
+    Deterministic for a given y, so `incremental_train` can reproduce the
+    split `train_model` made on the original rows.
+    """
+    return train_test_split(
+        np.arange(len(y)), test_size=CALIBRATION_SIZE, stratify=y, random_state=42
     )
 
 
@@ -41,11 +88,16 @@ def train_model(X: np.ndarray, y: np.ndarray) -> CalibratedClassifierCV:
     Train a calibrated credit scoring model.
 
     Architecture:
+        HistGradientBoostingClassifier fitted once on 80% of (X, y), then
         CalibratedClassifierCV(
-            estimator = GradientBoostingClassifier,
+            estimator = <prefit GBM>,
             method    = 'isotonic'   # non-parametric calibration
-            cv        = 5
-        )
+        ) fitted on the stratified 20% holdout.
+
+    A single holdout calibration fits the GBM once instead of 5 times (and
+    predicts with one GBM instead of averaging 5). The tradeoff is that the
+    base model sees 20% less data and the isotonic map is learned from
+    CALIBRATION_SIZE × n samples rather than all n out-of-fold predictions.
 
     Args:
         X: Feature matrix, shape (n_samples, n_features).
@@ -54,31 +106,156 @@ def train_model(X: np.ndarray, y: np.ndarray) -> CalibratedClassifierCV:
     Returns:
         Fitted CalibratedClassifierCV.
     """
-    base = _build_base_estimator()
-    calibrated = CalibratedClassifierCV(
-        estimator=base,
-        method="isotonic",   # non-parametric; better than sigmoid for GBM
-        cv=5,
-    )
-    calibrated.fit(X, y)
+    X, y = np.asarray(X), np.asarray(y)
+    fit_idx, cal_idx = _calibration_split(y)
+    base = _build_base_estimator().fit(X[fit_idx], y[fit_idx])
+    calibrated = _build_calibrated_estimator(base)
+    calibrated.fit(X[cal_idx], y[cal_idx])
+    return calibrated
+
+
+def incremental_train(
+    model: CalibratedClassifierCV,
+    X: np.ndarray,
+    y: np.ndarray,
+    n_prev: int,
+) -> CalibratedClassifierCV:
+    """
+    Retrain a fitted model on updated data with a stable calibration holdout.
+
+    (X, y) must be the rows `model` was trained on, in the same order,
+    followed by the appended rows. The first `n_prev` rows keep the
+    fit/calibration assignment `train_model` gave them; the appended rows
+    are split separately. A fresh HistGradientBoostingClassifier with the
+    model's hyperparameters is fit on the fit rows and the isotonic
+    calibrator is refit on the calibration rows, which the GBM never sees.
+    `model` itself is left untouched.
+
+    The GBM is refit rather than warm-started: HGBT rebuilds its bin mapper
+    on every fit, so trees carried over from the old model would be scored
+    against the new bins while boosting and against raw thresholds at
+    predict time.
+
+    Args:
+        model: Fitted model from `train_model` (single holdout-calibrated GBM).
+        X: Original rows followed by appended rows, same feature order.
+        y: Binary labels aligned with X.
+        n_prev: Number of leading rows the model was originally trained on.
+
+    Returns:
+        New fitted CalibratedClassifierCV.
+    """
+    if len(model.calibrated_classifiers_) != 1:
+        raise ValueError("incremental_train needs a single holdout-calibrated model")
+    X, y = np.asarray(X), np.asarray(y)
+    if not 0 < n_prev <= len(y):
+        raise ValueError(f"n_prev must be in (0, {len(y)}], got {n_prev}")
+
+    prev_fit, prev_cal = _calibration_split(y[:n_prev])
+    n_new = len(y) - n_prev
+    if n_new < 2:
+        new_fit, new_cal = np.arange(n_new), np.arange(0)
+    else:
+        try:
+            new_fit, new_cal = _calibration_split(y[n_prev:])
+        except ValueError:  # too few rows per class to stratify
+            new_fit, new_cal = train_test_split(
+                np.arange(n_new), test_size=CALIBRATION_SIZE, random_state=42
+            )
+    fit_idx = np.concatenate([prev_fit, n_prev + new_fit])
+    cal_idx = np.concatenate([prev_cal, n_prev + new_cal])
+    if np.intersect1d(cal_idx, fit_idx).size:
+        raise ValueError("calibration rows overlap the rows the GBM is fit on")
+
+    base = model.calibrated_classifiers_[0].estimator
+    if FrozenEstimator is not None and isinstance(base, FrozenEstimator):
+        base = base.estimator
+    base = clone(base).set_params(warm_start=False)
+    base.fit(X[fit_idx], y[fit_idx])
+    calibrated = _build_calibrated_estimator(base)
+    calibrated.fit(X[cal_idx], y[cal_idx])
     return calibrated
 
 
 def save_model(model: CalibratedClassifierCV, path=None) -> Path:
-    """Save the calibrated model with joblib."""
+    """
+    Save the calibrated model with joblib.
+
+    Written uncompressed so `load_model` can memory-map the tree/threshold
+    arrays, and via a temp file + rename so a process that already has the
+    old file mapped is never left reading a truncated one.
+    """
     out_path = Path(path) if path is not None else DEFAULT_MODEL_PATH
     out_path = out_path.resolve()
-    joblib.dump(model, out_path)
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    joblib.dump(model, tmp_path)
+    tmp_path.replace(out_path)
     return out_path
 
 
 def load_model(path=None) -> CalibratedClassifierCV:
-    """Load a persisted calibrated model from disk."""
+    """Load a persisted calibrated model from disk (numpy arrays mmapped read-only)."""
     p = Path(path) if path is not None else DEFAULT_MODEL_PATH
     p = p.resolve()
     if not p.is_file():
         raise FileNotFoundError(f"Model file not found: {p}")
-    return joblib.load(p)
+    return joblib.load(p, mmap_mode="r")
+
+
+def fast_predict_proba(model: CalibratedClassifierCV, X: np.ndarray) -> np.ndarray:
+    """
+    `model.predict_proba(X)` for a binary isotonic CalibratedClassifierCV.
+
+    Evaluates each base estimator's decision function once and applies the
+    fitted isotonic step-linear map directly with `np.interp` over its
+    thresholds, skipping the per-call validation / label encoding that
+    CalibratedClassifierCV and IsotonicRegression do. Any other model (a
+    bare Pipeline, a sigmoid-calibrated wrapper, ...) falls back to
+    `model.predict_proba`.
+    """
+    if not isinstance(model, CalibratedClassifierCV):
+        return model.predict_proba(X)
+    ccs = model.calibrated_classifiers_
+    if len(model.classes_) != 2 or not all(
+        len(cc.calibrators) == 1 and isinstance(cc.calibrators[0], IsotonicRegression)
+        for cc in ccs
+    ):
+        return model.predict_proba(X)
+
+    p_pos = np.zeros(len(X), dtype=np.float64)
+    for cc in ccs:
+        est = cc.estimator
+        if hasattr(est, "decision_function"):
+            scores = est.decision_function(X)
+        else:
+            scores = est.predict_proba(X)[:, 1]
+        iso = cc.calibrators[0]
+        # np.interp clamps to the end points, same as out_of_bounds="clip"
+        p_pos += np.interp(scores, iso.X_thresholds_, iso.y_thresholds_)
+    p_pos /= len(ccs)
+    np.clip(p_pos, 0.0, 1.0, out=p_pos)
+    return np.column_stack([1.0 - p_pos, p_pos])
+
+
+def binned_calibration(
+    y: np.ndarray,
+    proba: np.ndarray,
+    n_bins: int = 10,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Uniform-bin calibration curve in a single pass over `proba`.
+
+    Same output as sklearn's `calibration_curve(strategy="uniform")`:
+    (fraction of positives, mean predicted prob) for each non-empty bin.
+    """
+    proba  = np.asarray(proba, dtype=np.float64)
+    edges  = np.linspace(0.0, 1.0, n_bins + 1)
+    idx    = np.searchsorted(edges[1:-1], proba)
+    counts = np.bincount(idx, minlength=n_bins)
+    sums   = np.bincount(idx, weights=proba, minlength=n_bins)
+    pos    = np.bincount(idx, weights=y, minlength=n_bins)
+    nz     = counts > 0
+    return pos[nz] / counts[nz], sums[nz] / counts[nz]
 
 
 def evaluate_calibration(
@@ -89,7 +266,7 @@ def evaluate_calibration(
 ) -> Tuple[np.ndarray, np.ndarray]:
     """Compute calibration curve (fraction of positives vs mean predicted prob)."""
     proba = model.predict_proba(X)[:, 1]
-    frac_pos, mean_prob = calibration_curve(y, proba, n_bins=n_bins)
+    frac_pos, mean_prob = binned_calibration(y, proba, n_bins=n_bins)
     return frac_pos, mean_prob
 
 
@@ -98,14 +275,65 @@ def evaluate_accuracy(model: CalibratedClassifierCV, X: np.ndarray, y: np.ndarra
     return float(model.score(X, y))
 
 
+def _cache_key(X: np.ndarray, y: np.ndarray) -> str:
+    """Content hash of the training data, estimator hyperparameters and sklearn version."""
+    h = hashlib.blake2b(digest_size=16)
+    for arr in (X, y):
+        arr = np.ascontiguousarray(arr)
+        h.update(repr((arr.shape, arr.dtype.str)).encode())
+        h.update(arr.tobytes())
+    params = _build_base_estimator().get_params()
+    h.update(repr((sorted(params.items()), CALIBRATION_METHOD, CALIBRATION_SIZE,
+                   sklearn.__version__)).encode())
+    return h.hexdigest()
+
+
+def _prune_cache(out_path: Path, keep: Path) -> None:
+    """Delete stale ``<stem>.<hash>.pkl`` cache files beside `out_path`."""
+    for p in out_path.parent.glob(f"{out_path.stem}.*.pkl"):
+        key = p.name[len(out_path.stem) + 1:-len(".pkl")]
+        if p != keep and len(key) == 32 and all(c in "0123456789abcdef" for c in key):
+            p.unlink(missing_ok=True)
+
+
 def train_and_save(
     X: np.ndarray,
     y: np.ndarray,
     model_path=None,
 ) -> Tuple[CalibratedClassifierCV, float, Path]:
-    """Train, evaluate, save, and return (model, accuracy, path)."""
-    model    = train_model(X, y)
+    """
+    Train, evaluate, save, and return (model, accuracy, path).
+
+    The fitted model is cached next to the target path as
+    ``<stem>.<hash>.pkl``, keyed on (X, y, hyperparameters, sklearn version).
+    A re-run on unchanged inputs loads the cached model instead of
+    retraining; a cache file that fails to load counts as a miss. Only the
+    latest cache entry is kept; older ``<stem>.<hash>.pkl`` files are removed.
+    The key of the model at the target path is recorded in ``<name>.key``
+    so a cache hit doesn't rewrite an identical model.
+    """
+    out_path   = Path(model_path) if model_path is not None else DEFAULT_MODEL_PATH
+    out_path   = out_path.resolve()
+    key        = _cache_key(X, y)
+    cache_path = out_path.with_suffix(f".{key}.pkl")
+    key_path   = out_path.with_name(out_path.name + ".key")
+
+    model = None
+    if cache_path.is_file():
+        try:
+            model = load_model(cache_path)
+        except Exception:
+            model = None  # unreadable / incompatible pickle → retrain
+    if model is None:
+        model = train_model(X, y)
+        save_model(model, path=cache_path)
     accuracy = evaluate_accuracy(model, X, y)
     print(f"Model accuracy: {accuracy:.4f}")
-    path = save_model(model, path=model_path)
-    return model, accuracy, path
+    up_to_date = (
+        out_path.is_file() and key_path.is_file() and key_path.read_text() == key
+    )
+    if not up_to_date:
+        save_model(model, path=out_path)
+        key_path.write_text(key)
+    _prune_cache(out_path, keep=cache_path)
+    return model, accuracy, out_path
@@ -21,8 +21,8 @@ import pandas as pd
 from pathlib import Path
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import (
-    accuracy_score, f1_score, precision_score,
-    recall_score, roc_auc_score, classification_report,
+    accuracy_score, f1_score, precision_recall_fscore_support,
+    roc_auc_score, classification_report,
 )
 
 from feature_engineering import FEATURE_ORDER
@@ -284,13 +284,16 @@ def generate_synthetic_data(n: int = N_SAMPLES, seed: int = RANDOM_SEED) -> pd.D
 def evaluate_split(model, X, y, label: str) -> dict:
     preds = model.predict(X)
     proba = model.predict_proba(X)[:, 1]
+    prec, rec, f1, _ = precision_recall_fscore_support(
+        y, preds, average="binary", zero_division=0
+    )
     return {
         "label":     label,
         "n":         len(y),
         "accuracy":  round(accuracy_score(y, preds), 4),
-        "precision": round(precision_score(y, preds, zero_division=0), 4),
-        "recall":    round(recall_score(y, preds, zero_division=0), 4),
-        "f1":        round(f1_score(y, preds, zero_division=0), 4),
+        "precision": round(prec, 4),
+        "recall":    round(rec, 4),
+        "f1":        round(f1, 4),
         "roc_auc":   round(roc_auc_score(y, proba), 4),
     }
 
@@ -308,12 +311,17 @@ def main() -> None:
 
     print(f"Class balance — defaulted: {df['defaulted'].mean():.2%}")
 
-    X = df[FEATURE_ORDER].values.astype(np.float64)
-    y = df["defaulted"].values
+    # One typed pass DataFrame → float64 matrix (same precision as serving);
+    # everything below slices it.
+    X = df[FEATURE_ORDER].to_numpy(dtype=np.float64)
+    y = df["defaulted"].to_numpy()
+    profiles = df["_profile"].to_numpy()
 
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=TEST_SIZE, random_state=RANDOM_SEED, stratify=y
+    idx_train, idx_test = train_test_split(
+        np.arange(len(df)), test_size=TEST_SIZE, random_state=RANDOM_SEED, stratify=y
     )
+    X_train, X_test = X[idx_train], X[idx_test]
+    y_train, y_test = y[idx_train], y[idx_test]
     print(f"Split: {len(X_train)} train / {len(X_test)} test  (80/20, stratified)")
 
     print("Training StandardScaler + LogisticRegression pipeline...")
@@ -341,19 +349,16 @@ def main() -> None:
     ))
 
     # Per-profile metrics on test set
-    df_test = df.iloc[
-        train_test_split(range(len(df)), test_size=TEST_SIZE,
-                         random_state=RANDOM_SEED, stratify=y)[1]
-    ]
+    p_test = profiles[idx_test]
     print("  [Per-Profile Test Metrics]")
     print(f"  {'Profile':<13} {'Acc':>6}  {'F1':>6}  {'n':>5}")
     print(f"  {'-'*35}")
     for name in ["salaried", "student", "gig", "shopkeeper", "rural"]:
-        mask = df_test["_profile"] == name
+        mask = p_test == name
         if mask.sum() == 0:
             continue
-        Xi = df_test.loc[mask, FEATURE_ORDER].values.astype(np.float64)
-        yi = df_test.loc[mask, "defaulted"].values
+        Xi = X_test[mask]
+        yi = y_test[mask]
         pi = model.predict(Xi)
         acc = accuracy_score(yi, pi)
         f1  = f1_score(yi, pi, zero_division=0)